@@ -1,4 +1,5 @@
 import os
+import csv
 import pandas as pd
 import streamlit as st
 import subprocess
@@ -6,6 +7,8 @@ from datetime import datetime
 import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # ---------- Config ----------
 st.set_page_config(
@@ -47,6 +50,43 @@ COMPANY_STAGES = ["Formation", "Traction"]
 
 CHEQUE_OPTIONS = ["Core", "Traction"]
 
+# Filter selectbox options: "All" (no filtering) followed by each value
+ALL_DESIGNATIONS = ("All", *DESIGNATIONS)
+ALL_TEAMS = ("All", *TEAMS)
+ALL_PIPELINE_STAGES = ("All", *PIPELINE_STAGES)
+ALL_SECTORS = ("All", *SECTORS)
+ALL_COMPANY_STAGES = ("All", *COMPANY_STAGES)
+
+# Explicit parse dtypes so read_csv skips type inference; everything else is text
+ID_COLUMNS = ["player_id", "company_id"]
+
+# Repeated string columns stored as categoricals so filters and counts work on integer codes
+CATEGORY_COLUMNS = ["player_name", "company_name"]
+
+# Columns drawn from the fixed option lists above, stored as categoricals with
+# those lists as their categories
+VOCABULARY_COLUMNS = {
+    "designation": DESIGNATIONS,
+    "team": TEAMS,
+    "pipeline_stage": PIPELINE_STAGES,
+    "founder_archetype": FOUNDER_ARCHETYPES,
+    "sector": SECTORS,
+    "company_stage": COMPANY_STAGES,
+    "cheque": CHEQUE_OPTIONS,
+}
+
+# Vocabulary columns whose option order is meaningful, so groupbys and sorts follow it
+ORDERED_COLUMNS = ["pipeline_stage"]
+
+# Category code of "Partner" in the designation column, whose categories start with DESIGNATIONS
+PARTNER_CODE = DESIGNATIONS.index("Partner")
+
+# Shared st.plotly_chart config: no mode bar or Plotly logo on the Insights charts
+PLOTLY_CFG = {"displayModeBar": False, "displaylogo": False}
+
+# Parquet schema metadata key holding the csv_stamp of the CSV a snapshot was taken from
+SNAPSHOT_SOURCE_KEY = b"source_csv"
+
 
 # ---------- Helpers ----------
 def ensure_data_dir():
@@ -54,56 +94,482 @@ def ensure_data_dir():
         os.makedirs(DATA_DIR, exist_ok=True)
 
 
-def load_csv(path: str, columns: list[str]) -> pd.DataFrame:
-    ensure_data_dir()
-    if os.path.exists(path):
+def file_stamp(path: str) -> tuple[int, int]:
+    """Modification time (ns) and size of a data file, or (0, 0) if it doesn't exist yet"""
+    if not os.path.exists(path):
+        return (0, 0)
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def snapshot_path(path: str) -> str:
+    """Path of the Parquet snapshot kept next to a CSV data file"""
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def csv_header(path: str) -> list[str]:
+    """Column names from the first line of a CSV file (empty if the file is missing or blank)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, newline="") as f:
+        return next(csv.reader(f), [])
+
+
+def csv_stamp(path: str) -> bytes:
+    """The CSV's file_stamp as bytes, stored in its Parquet snapshot to identify the exact version it was taken from"""
+    mtime_ns, size = file_stamp(path)
+    return f"{mtime_ns}:{size}".encode()
+
+
+def read_table(path: str, columns: tuple[str, ...]) -> pd.DataFrame:
+    """Read a CSV through its Parquet snapshot, refreshing the snapshot when the CSV has changed.
+
+    The CSV stays the source of truth (it's what gets committed); the snapshot
+    only saves re-parsing text on cold starts. It records the stamp of the CSV it
+    was taken from and is used only while that still matches exactly, so a CSV
+    restored with an older mtime, or rewritten within the same mtime tick, is re-parsed.
+    """
+    stamp = csv_stamp(path)
+    snapshot = snapshot_path(path)
+    if os.path.exists(snapshot):
         try:
-            df = pd.read_csv(path)
-            for col in columns:
-                if col not in df.columns:
-                    df[col] = None
-            return df[columns]
+            metadata = pq.read_schema(snapshot).metadata or {}
+            if metadata.get(SNAPSHOT_SOURCE_KEY) == stamp:
+                # Column pushdown: only the table's columns are read off disk
+                return pd.read_parquet(snapshot, columns=list(columns))
         except Exception:
-            return pd.DataFrame(columns=columns)
+            pass
+
+    # The pyarrow engine needs usecols as a list, so take it from the header
+    df = pd.read_csv(
+        path,
+        engine="pyarrow",
+        usecols=[col for col in csv_header(path) if col in columns],
+        dtype={col: "Int64" if col in ID_COLUMNS else str for col in columns},
+    )
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), SNAPSHOT_SOURCE_KEY: stamp})
+        pq.write_table(table, snapshot, compression="snappy")
+    except Exception:
+        pass
+    return df
+
+
+def vocabulary_dtype(values: pd.Series, vocabulary: list[str], ordered: bool = False) -> pd.CategoricalDtype:
+    """Categorical dtype over `vocabulary`, extended with any values outside it so none are lost"""
+    extra = set(values.dropna()) - set(vocabulary)
+    return pd.CategoricalDtype(list(vocabulary) + sorted(extra), ordered=ordered)
+
+
+def normalize_columns(df: pd.DataFrame, columns: tuple[str, ...]) -> pd.DataFrame:
+    """Select `columns` (adding any that are missing) and apply the categorical dtypes"""
+    for col in columns:
+        if col not in df.columns:
+            df[col] = None
+    df = df[list(columns)]
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col, vocabulary in VOCABULARY_COLUMNS.items():
+        if col in df.columns:
+            df[col] = df[col].astype(vocabulary_dtype(df[col], vocabulary, ordered=col in ORDERED_COLUMNS))
+    return df
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _read_csv(path: str, columns: tuple[str, ...], stamp: tuple[int, int]) -> pd.DataFrame:
+    """Parse a data file. `stamp` is only used as part of the cache key."""
+    try:
+        return normalize_columns(read_table(path, columns), columns)
+    except Exception:
+        return normalize_columns(pd.DataFrame(columns=list(columns)), columns)
+
+
+def load_csv(path: str, columns: tuple[str, ...]) -> pd.DataFrame:
+    ensure_data_dir()
+    if os.path.exists(path):
+        return _read_csv(path, columns, file_stamp(path))
     else:
-        df = pd.DataFrame(columns=columns)
+        df = pd.DataFrame(columns=list(columns))
         df.to_csv(path, index=False)
-        return df
+        return normalize_columns(df, columns)
+
+
+def evict_cached(path: str, columns: tuple[str, ...], stamp: tuple[int, int]):
+    """Drop one file's cached frame, leaving the other data files' entries warm"""
+    _read_csv.clear(path, columns, stamp)
+
+
+def session_df_key(path: str) -> str:
+    return f"df:{path}"
+
+
+def get_df(path: str, columns: tuple[str, ...]) -> pd.DataFrame:
+    """This session's copy of a data file, reloaded only when the file changes on disk"""
+    entry = st.session_state.get(session_df_key(path))
+    if entry is None or entry["stamp"] != file_stamp(path):
+        df = load_csv(path, columns)
+        entry = {"df": df, "stamp": file_stamp(path)}
+        st.session_state[session_df_key(path)] = entry
+    return entry["df"]
 
 
 def save_csv(df: pd.DataFrame, path: str):
     ensure_data_dir()
+    old_stamp = file_stamp(path)
     df.to_csv(path, index=False)
-
-
-def get_partners(players_df: pd.DataFrame) -> list[str]:
+    # Drop this file's cached frame and hand the session the frame we just
+    # wrote, so the next rerun doesn't have to read the file back
+    evict_cached(path, tuple(df.columns), old_stamp)
+    st.session_state[session_df_key(path)] = {
+        "df": normalize_columns(df.reset_index(drop=True), tuple(df.columns)),
+        "stamp": file_stamp(path),
+    }
+
+
+def ends_with_newline(path: str) -> bool:
+    """Whether a file is empty or its last byte is a newline"""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def append_row(path: str, columns: tuple[str, ...], row: dict):
+    """Append a single row to a data file without re-serializing the whole table"""
+    ensure_data_dir()
+    header = csv_header(path)
+
+    # Missing file or outdated header - fall back to a full rewrite
+    if not header or set(columns) - set(header):
+        df = load_csv(path, columns)
+        df.loc[len(df)] = [row.get(col) for col in columns]
+        save_csv(df, path)
+        return
+
+    old_stamp = file_stamp(path)
+    needs_newline = not ends_with_newline(path)
+    with open(path, "a", newline="") as f:
+        if needs_newline:
+            f.write(os.linesep)
+        writer = csv.DictWriter(f, fieldnames=header, extrasaction="ignore", lineterminator=os.linesep)
+        writer.writerow(row)
+    evict_cached(path, columns, old_stamp)
+    # The session's copy no longer matches the file; get_df reloads it on next use
+    st.session_state.pop(session_df_key(path), None)
+
+
+def encode_list(items: list[str]) -> str:
+    """Store a multiselect value as the comma-separated cell used in the data files"""
+    return ", ".join(items)
+
+
+def explode_list(df: pd.DataFrame, col: str, item_col: str) -> pd.DataFrame:
+    """One row per item of the comma-separated `col`, held in `item_col`; blank cells give no rows"""
+    cells = df[col]
+    df = df[cells.notna() & (cells != "")]
+    exploded = df.assign(**{item_col: df[col].str.split(",")}).explode(item_col, ignore_index=True)
+    exploded[item_col] = exploded[item_col].str.strip()
+    return exploded
+
+
+@st.cache_data(show_spinner=False)
+def unique_sorted(values: tuple) -> list:
+    """Sorted distinct non-empty values, computed once per distinct input"""
+    arr = np.array(values, dtype=object)
+    return np.unique(arr[pd.notna(arr) & (arr != "")]).tolist()
+
+
+# get_partners, get_all_players_names, name_index, portfolios_with_players,
+# overview_summaries, compute_insights, cheque_figures and alignment_figure are
+# keyed on the stamps of the data files they read (data_version() for all three)
+# and take the frames as `_`-prefixed arguments, which st.cache_data leaves
+# unhashed. A write changes the stamp, so no explicit clear() is needed.
+@st.cache_data(show_spinner=False)
+def get_partners(players_stamp: tuple[int, int], _players_df: pd.DataFrame) -> list[str]:
     """Get list of all partners"""
-    partners = players_df[players_df["designation"] == "Partner"]["player_name"].dropna().tolist()
-    return sorted(partners)
+    codes = _players_df["designation"].cat.codes.to_numpy()
+    partners = _players_df["player_name"].to_numpy()[codes == PARTNER_CODE]
+    return np.sort(partners[pd.notna(partners)]).tolist()
 
 
-def get_all_players_names(players_df: pd.DataFrame) -> list[str]:
+@st.cache_data(show_spinner=False)
+def get_all_players_names(players_stamp: tuple[int, int], _players_df: pd.DataFrame) -> list[str]:
     """Get list of all player names"""
-    return sorted(players_df["player_name"].dropna().tolist())
+    return unique_sorted(tuple(_players_df["player_name"]))
+
+
+@st.cache_data(show_spinner=False)
+def name_index(stamp: tuple[int, int], _df: pd.DataFrame, key_col: str, value_col: str) -> dict:
+    """Map each value of `key_col` to `value_col` on its first row, for O(1) lookups"""
+    first_rows = _df.drop_duplicates(key_col)
+    return dict(zip(first_rows[key_col], first_rows[value_col]))
+
+
+@st.cache_data(show_spinner=False)
+def portfolios_with_players(portfolios_stamp: tuple[int, int], players_stamp: tuple[int, int],
+                            _portfolios_df: pd.DataFrame, _players_df: pd.DataFrame) -> pd.DataFrame:
+    """Join player names and designations onto the id-keyed portfolio table for display"""
+    view = _portfolios_df.merge(
+        _players_df[["player_id", "player_name", "designation"]],
+        on="player_id",
+        how="inner"
+    )
+    return view[["player_id", "player_name", "designation", "companies"]]
+
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def arrow_table(key: tuple, _df: pd.DataFrame) -> pa.Table:
+    """Arrow form of a table for st.dataframe, converted once per `key`.
+
+    `key` must identify the frame's contents (data file stamps plus any active
+    filters); the frame itself is not hashed.
+    """
+    return pa.Table.from_pandas(_df, preserve_index=False)
+
+
+@st.cache_data(show_spinner=False)
+def overview_summaries(players_stamp: tuple[int, int], companies_stamp: tuple[int, int],
+                       _players_df: pd.DataFrame, _companies_df: pd.DataFrame) -> dict[str, pd.Series]:
+    """Value counts shown on the Overview tab"""
+    summaries = {
+        "designation": _players_df["designation"].value_counts(),
+        "team": _players_df["team"].value_counts(),
+        "pipeline_stage": _companies_df["pipeline_stage"].value_counts(),
+        "sector": _companies_df["sector"].value_counts(),
+    }
+    # Categorical counts include every category; only show values that occur
+    return {key: counts[counts > 0] for key, counts in summaries.items()}
+
+
+def smallest_int(values: pd.Series) -> pd.Series:
+    """Integer counts in the narrowest dtype that holds them"""
+    return pd.to_numeric(values, downcast="integer")
+
+
+def count_by(values: pd.Series, name: str) -> pd.DataFrame:
+    """Rows per distinct value as a two-column frame, like groupby(col).size() without building a grouper"""
+    counts = values.value_counts(sort=False)
+    # Categorical counts include every category; keep only values that occur
+    counts = counts[counts > 0]
+    return counts.rename_axis(values.name).reset_index(name=name)
+
+
+def average_votes_by(rows: pd.DataFrame, key: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Average votes per `key` value, by pipeline stage and overall, from one groupby pass.
+
+    The overall averages are pooled from the per-stage sums and counts; rows with
+    no stage are kept for those and only left out of the stagewise table.
+    """
+    by_stage = rows.groupby([key, 'pipeline_stage'], observed=True, dropna=False)['votes'].agg(['sum', 'count'])
+    totals = by_stage.groupby(level=key).sum()
+
+    stagewise = (by_stage['sum'] / by_stage['count']).rename('votes').reset_index()
+    stagewise = stagewise[stagewise['pipeline_stage'].notna()]
+    overall = (totals['sum'] / totals['count']).rename('votes').reset_index()
+    return stagewise, overall
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_insights(version: tuple, _players_df: pd.DataFrame, _companies_df: pd.DataFrame,
+                     _portfolio_view: pd.DataFrame) -> dict:
+    """Vote tables behind the Insights tab"""
+    # Create vote matrix: one row per (player, company voted for)
+    votes_df = explode_list(_portfolio_view, 'companies', 'company_name')[
+        ['player_id', 'player_name', 'designation', 'company_name']
+    ]
+    if not len(votes_df):
+        return {'votes_df': votes_df}
+
+    # Join on company data (pipeline stages, leads, etc.) and the voter's team in one
+    # chain, looking rows up by index (players by integer id, not name)
+    votes_df = votes_df.join(
+        _companies_df.set_index('company_name')[['pipeline_stage', 'sector', 'cheque', 'lead', 'co_lead']],
+        on='company_name'
+    ).join(_players_df.set_index('player_id')[['team']], on='player_id')
+
+    # Calculate votes per company
+    company_votes = votes_df['company_name'].value_counts(sort=False)
+
+    # Votes for every company row, zero where nobody voted for it; map on the
+    # categorical name looks up each category once and fans out by code. The
+    # result is itself categorical when the counts are all distinct, so make it
+    # numeric before filling the blanks
+    stage_analysis = _companies_df.assign(
+        votes=_companies_df['company_name'].map(company_votes).astype('float64').fillna(0).astype('int64')
+    )
+    all_companies = stage_analysis[['company_name', 'votes']].sort_values('votes', ascending=False, kind='stable')
+    all_companies['votes'] = smallest_int(all_companies['votes'])
+
+    # Parse leads and co-leads (they're comma-separated) into one row per name
+    lead_votes_df = explode_list(stage_analysis, 'lead', 'lead')[
+        ['lead', 'pipeline_stage', 'votes', 'company_name']
+    ].rename(columns={'company_name': 'company'})
+    co_lead_votes_df = explode_list(stage_analysis, 'co_lead', 'co_lead')[
+        ['co_lead', 'pipeline_stage', 'votes', 'company_name']
+    ].rename(columns={'company_name': 'company'})
+
+    # Create voting matrix for heatmap
+    vote_matrix = pd.crosstab(votes_df['player_name'], votes_df['company_name']).apply(smallest_int)
+
+    return {
+        'votes_df': votes_df,
+        'avg_votes_per_company': company_votes.mean(),
+        'all_companies': all_companies,
+        'stage_analysis': stage_analysis,
+        'lead_votes_df': lead_votes_df,
+        'co_lead_votes_df': co_lead_votes_df,
+        'vote_matrix': vote_matrix,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def cheque_figures(version: tuple, _stage_analysis: pd.DataFrame) -> tuple[go.Figure, go.Figure]:
+    """Total and average votes by cheque type as bar charts"""
+    cheque_analysis = _stage_analysis.groupby('cheque', observed=True)['votes'].agg(['sum', 'mean', 'count']).reset_index()
+    cheque_analysis.columns = ['Cheque Type', 'Total Votes', 'Avg Votes', 'Count']
+
+    fig_cheque_total = px.bar(
+        cheque_analysis,
+        x='Cheque Type',
+        y='Total Votes',
+        title='Total Votes by Cheque Type',
+        color='Total Votes',
+        color_continuous_scale='Blues'
+    )
+    fig_cheque_total.update_layout(height=350, showlegend=False)
+
+    fig_cheque_avg = px.bar(
+        cheque_analysis,
+        x='Cheque Type',
+        y='Avg Votes',
+        title='Average Votes by Cheque Type',
+        color='Avg Votes',
+        color_continuous_scale='Teal'
+    )
+    fig_cheque_avg.update_layout(height=350, showlegend=False)
+    return fig_cheque_total, fig_cheque_avg
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def alignment_figure(version: tuple, _alignment_summary: pd.DataFrame) -> go.Figure:
+    """Same-pod vs cross-pod voting as a pie chart"""
+    fig_alignment = px.pie(
+        _alignment_summary,
+        names='same_pod',
+        values='votes',
+        title='Same-Pod vs Cross-Pod Voting',
+        color_discrete_sequence=px.colors.qualitative.Set2
+    )
+    fig_alignment.update_layout(height=350)
+    return fig_alignment
+
+
+def consensus_lines(rows: pd.DataFrame) -> str:
+    """One markdown bullet per company with its vote share, as a single block"""
+    return "\n\n".join(
+        f"• **{name}** - {pct}% ({int(votes)} votes)"
+        for name, pct, votes in zip(rows['company_name'], rows['vote_percentage'], rows['votes'])
+    )
+
+
+def render_counts(counts: pd.Series, label: str):
+    """Render a value_counts result as a two-column `label` / Count table"""
+    st.dataframe(
+        counts.rename_axis(label).reset_index(name="Count"),
+        use_container_width=True,
+        hide_index=True
+    )
+
+
+def render_filtered_table(name: str, df: pd.DataFrame, filter_specs: list[tuple[str, str, tuple[str, ...]]],
+                          column_config: dict, version: tuple, empty_message: str | None = None):
+    """Filter selectboxes over `df`, one per (column, label, options) spec, and a table of the matching rows.
+
+    Each spec's options start with "All", which leaves that column unfiltered.
+
+    `version` identifies the frame's contents (its data files' stamps) for the
+    cached Arrow conversion. If `empty_message` is given it is shown instead of an
+    empty table, with any `{}` placeholders filled by the chosen filter values.
+    """
+    choices = []
+    for filter_col, (col, label, options) in zip(st.columns(len(filter_specs)), filter_specs):
+        with filter_col:
+            choices.append(st.selectbox(label, options=options, key=f"{name}_{col}_filter"))
+
+    mask = np.ones(len(df), dtype=bool)
+    for (col, _, _), choice in zip(filter_specs, choices):
+        if choice != "All":
+            mask &= (df[col] == choice).to_numpy()
+    # Only materialize a new frame when a filter actually narrows the rows
+    filtered = df if mask.all() else df[mask]
+
+    if empty_message and not len(filtered):
+        st.info(empty_message.format(*choices))
+        return
+    st.dataframe(
+        arrow_table((name, *version, *choices), filtered),
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config
+    )
+
+
+def data_version() -> tuple[tuple[int, int], ...]:
+    """Stamps of the three data files, used to spot changes made elsewhere"""
+    return file_stamp(PLAYERS_CSV), file_stamp(COMPANIES_CSV), file_stamp(PORTFOLIOS_CSV)
+
+
+def next_id(df: pd.DataFrame, id_col: str) -> int:
+    return int(df[id_col].max() + 1) if len(df) else 1
+
+
+def sync_session_stats(players_df: pd.DataFrame, companies_df: pd.DataFrame, portfolios_df: pd.DataFrame):
+    """Seed row counts in session state, reseeding only when the files change on disk"""
+    version = data_version()
+    if st.session_state.get("data_version") == version:
+        return
+    st.session_state["data_version"] = version
+    st.session_state["counts"] = {
+        "players": len(players_df),
+        "companies": len(companies_df),
+        "portfolios": len(portfolios_df),
+    }
+
+
+def next_id_key(path: str) -> str:
+    return f"next_id:{path}"
+
+
+def session_next_id(path: str, columns: tuple[str, ...], id_col: str) -> int:
+    """Next free id for a data file, from a session counter reseeded from the file whenever its stamp changes"""
+    entry = st.session_state.get(next_id_key(path))
+    if entry is None or entry["stamp"] != file_stamp(path):
+        entry = {"id": next_id(load_csv(path, columns), id_col), "stamp": file_stamp(path)}
+        st.session_state[next_id_key(path)] = entry
+    return entry["id"]
+
+
+def record_insert(path: str, new_id: int):
+    """Advance the id counter past a row this session just wrote, so the next insert doesn't reseed"""
+    st.session_state[next_id_key(path)] = {"id": new_id + 1, "stamp": file_stamp(path)}
 
 
 def save_to_github() -> tuple[bool, str]:
     """Commit and push data changes to GitHub"""
+    # Stage, check for changes, commit and push from a single shell rather than
+    # one git process per step; exit status 3 means there was nothing to commit
+    script = 'git add "data/*.csv" && { git diff --cached --quiet -- data/ && exit 3; git commit -m "$1" && git push; }'
     try:
-        # Add data files
-        subprocess.run(["git", "add", "data/*.csv"], check=True, capture_output=True, text=True)
-
-        # Check if there are changes to commit
-        status = subprocess.run(["git", "status", "--porcelain", "data/"], capture_output=True, text=True)
-        if not status.stdout.strip():
-            return False, "No changes to save"
-
         # Commit with timestamp
         commit_msg = f"Update portfolio data - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        subprocess.run(["git", "commit", "-m", commit_msg], check=True, capture_output=True, text=True)
-
-        # Push to remote
-        subprocess.run(["git", "push"], check=True, capture_output=True, text=True, timeout=30)
+        result = subprocess.run(["sh", "-c", script, "sh", commit_msg], capture_output=True, text=True, timeout=30)
+        if result.returncode == 3:
+            return False, "No changes to save"
+        result.check_returncode()
 
         return True, "Data saved to GitHub successfully!"
     except subprocess.TimeoutExpired:
@@ -115,18 +581,180 @@ def save_to_github() -> tuple[bool, str]:
 
 
 # ---------- Load data ----------
-PLAYER_COLUMNS = ["player_id", "player_name", "designation", "team"]
-COMPANY_COLUMNS = [
+# Tuples so they can be passed straight through as st.cache_data keys
+PLAYER_COLUMNS = ("player_id", "player_name", "designation", "team")
+COMPANY_COLUMNS = (
     "company_id", "company_name", "pipeline_stage", "founder_archetype",
     "sector", "company_stage", "cheque", "lead", "co_lead", "deal_team"
-]
-PORTFOLIO_COLUMNS = [
-    "player_id", "player_name", "designation", "companies"
-]
+)
+# Portfolios are stored by player id only; names and designations are joined in from players
+PORTFOLIO_COLUMNS = ("player_id", "companies")
+
+# st.dataframe column configs for the three data tables
+PLAYERS_COLUMN_CONFIG = {
+    "player_id": st.column_config.NumberColumn("ID", width="small"),
+    "player_name": st.column_config.TextColumn("Name", width="medium"),
+    "designation": st.column_config.TextColumn("Designation", width="medium"),
+    "team": st.column_config.TextColumn("Team", width="large"),
+}
+COMPANIES_COLUMN_CONFIG = {
+    "company_id": st.column_config.NumberColumn("ID", width="small"),
+    "company_name": st.column_config.TextColumn("Company Name", width="medium"),
+    "pipeline_stage": st.column_config.TextColumn("Pipeline Stage", width="small"),
+    "founder_archetype": st.column_config.TextColumn("Founder Type", width="small"),
+    "sector": st.column_config.TextColumn("Sector", width="small"),
+    "company_stage": st.column_config.TextColumn("Stage", width="small"),
+    "cheque": st.column_config.TextColumn("Cheque", width="small"),
+    "lead": st.column_config.TextColumn("Lead", width="medium"),
+    "co_lead": st.column_config.TextColumn("Co-Lead", width="medium"),
+    "deal_team": st.column_config.TextColumn("Deal Team", width="large"),
+}
+PORTFOLIOS_COLUMN_CONFIG = {
+    "player_id": st.column_config.NumberColumn("ID", width="small"),
+    "player_name": st.column_config.TextColumn("Name", width="medium"),
+    "designation": st.column_config.TextColumn("Designation", width="medium"),
+    "companies": st.column_config.TextColumn("Companies", width="large"),
+}
+
+players_df = get_df(PLAYERS_CSV, PLAYER_COLUMNS)
+companies_df = get_df(COMPANIES_CSV, COMPANY_COLUMNS)
+portfolios_df = get_df(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS)
+sync_session_stats(players_df, companies_df, portfolios_df)
+counts = st.session_state["counts"]
+portfolio_view = portfolios_with_players(
+    file_stamp(PORTFOLIOS_CSV), file_stamp(PLAYERS_CSV), portfolios_df, players_df
+)
+
+
+# ---------- Admin actions ----------
+# Form callbacks run before the rerun that the submit triggers, so the write is
+# already visible to every tab in that pass and no extra st.rerun() is needed.
+# The exception is the portfolio form: it runs as a fragment, whose submit
+# reruns only the fragment, so its callbacks ask for a full-app rerun instead.
+def set_flash(key: str, kind: str, message: str):
+    """Queue a message for the form identified by `key` to show on the next pass"""
+    st.session_state[f"flash:{key}"] = (kind, message)
+
+
+def show_flash(key: str):
+    """Show (once) the message queued for the form identified by `key`, if any"""
+    flash = st.session_state.pop(f"flash:{key}", None)
+    if flash:
+        kind, message = flash
+        getattr(st, kind)(message)
+
+
+def add_team_member():
+    player_name = st.session_state["new_player_name"].strip()
+    if not player_name:
+        set_flash("add_player", "error", "❌ Name is required.")
+        return
+
+    new_id = session_next_id(PLAYERS_CSV, PLAYER_COLUMNS, "player_id")
+    new_row = {
+        "player_id": new_id,
+        "player_name": player_name,
+        "designation": st.session_state["new_player_designation"],
+        "team": st.session_state["new_player_team"],
+    }
+
+    append_row(PLAYERS_CSV, PLAYER_COLUMNS, new_row)
+    record_insert(PLAYERS_CSV, new_id)
+    set_flash("add_player", "success", f"✅ Team member '{player_name}' added successfully!")
+
+
+def add_company():
+    company_name = st.session_state["new_company_name"].strip()
+    lead = st.session_state["new_company_lead"]
+    co_lead = st.session_state["new_company_co_lead"]
+    deal_team = st.session_state["new_company_deal_team"]
+    if not company_name:
+        set_flash("add_company", "error", "❌ Company name is required.")
+        return
+    if not lead:
+        set_flash("add_company", "error", "❌ At least one lead is required.")
+        return
+
+    new_id = session_next_id(COMPANIES_CSV, COMPANY_COLUMNS, "company_id")
+    new_row = {
+        "company_id": new_id,
+        "company_name": company_name,
+        "pipeline_stage": st.session_state["new_company_pipeline_stage"],
+        "founder_archetype": st.session_state["new_company_founder_archetype"],
+        "sector": st.session_state["new_company_sector"],
+        "company_stage": st.session_state["new_company_stage"],
+        "cheque": st.session_state["new_company_cheque"],
+        "lead": encode_list(lead),
+        "co_lead": encode_list(co_lead),
+        "deal_team": encode_list(deal_team),
+    }
+
+    append_row(COMPANIES_CSV, COMPANY_COLUMNS, new_row)
+    record_insert(COMPANIES_CSV, new_id)
+    set_flash("add_company", "success", f"✅ Company '{company_name}' added successfully!")
+
+
+def save_portfolio(player_id, player_name: str):
+    selected_companies = st.session_state[f"companies_{player_id}"]
+    portfolios_df = get_df(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS)
+    new_row = {
+        "player_id": player_id,
+        "companies": encode_list(selected_companies),
+    }
+
+    mask = (portfolios_df["player_id"] == player_id).to_numpy()
+    if not mask.any():
+        # First portfolio for this player - append instead of rewriting the file
+        if selected_companies:
+            append_row(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS, new_row)
+    else:
+        if selected_companies:
+            # Overwrite the player's entry where it is, without rebuilding the frame. Work
+            # on a copy: the session's frame is only replaced once save_csv has written
+            portfolios_df = portfolios_df.copy()
+            portfolios_df.loc[mask, "companies"] = new_row["companies"]
+        else:
+            # Nothing selected - remove the player's entry
+            portfolios_df = portfolios_df[~mask]
+
+        save_csv(portfolios_df, PORTFOLIOS_CSV)
+    set_flash(f"portfolio_{player_id}", "success", f"✅ Portfolio updated for {player_name}")
+    st.rerun(scope="app")
+
+
+def clear_portfolio(player_id, player_name: str):
+    portfolios_df = get_df(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS)
+    portfolios_df = portfolios_df[portfolios_df["player_id"] != player_id]
+    save_csv(portfolios_df, PORTFOLIOS_CSV)
+    set_flash(f"portfolio_{player_id}", "success", f"✅ Portfolio cleared for {player_name}")
+    st.rerun(scope="app")
+
+
+@st.fragment
+def portfolio_form(player_id, player_name: str, team: str, company_options: list[str], current_companies: list[str]):
+    """One player's portfolio form, run as a fragment; Save and Clear still rerun the whole app"""
+    with st.form(f"portfolio_form_{player_id}", clear_on_submit=False):
+        st.markdown(f"**{player_name}** — _{team}_")
+
+        st.multiselect(
+            "Companies",
+            options=company_options,
+            default=current_companies,
+            key=f"companies_{player_id}",
+            label_visibility="collapsed"
+        )
 
-players_df = load_csv(PLAYERS_CSV, PLAYER_COLUMNS)
-companies_df = load_csv(COMPANIES_CSV, COMPANY_COLUMNS)
-portfolios_df = load_csv(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS)
+        col_save, col_clear = st.columns([1, 1])
+        form_args = (player_id, player_name)
+        with col_save:
+            st.form_submit_button(
+                "💾 Save", use_container_width=True, on_click=save_portfolio, args=form_args
+            )
+        with col_clear:
+            st.form_submit_button(
+                "🗑️ Clear", use_container_width=True, on_click=clear_portfolio, args=form_args
+            )
+        show_flash(f"portfolio_{player_id}")
 
 
 # ---------- UI: Sidebar ----------
@@ -135,14 +763,15 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("Quick Statistics")
 
 col1, col2 = st.sidebar.columns(2)
-col1.metric("Team Members", len(players_df))
-col2.metric("Companies", len(companies_df))
+col1.metric("Team Members", counts["players"])
+col2.metric("Companies", counts["companies"])
 
 st.sidebar.markdown("---")
 st.sidebar.caption("Use the tabs to navigate between different views and administration functions.")
 
 
 # ---------- UI: Main Tabs ----------
+# Tracking the active tab lets expensive tabs skip their body when hidden
 tabs = st.tabs([
     "📈 Overview",
     "👥 Team Members",
@@ -150,23 +779,26 @@ tabs = st.tabs([
     "💼 Model Portfolios",
     "💡 Insights",
     "⚙️ Admin"
-])
+], key="main_tab", on_change="rerun")
 
 
 # ---------- Overview Tab ----------
 with tabs[0]:
     st.title("Overview")
+    summaries = overview_summaries(
+        file_stamp(PLAYERS_CSV), file_stamp(COMPANIES_CSV), players_df, companies_df
+    )
 
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Team Members", len(players_df))
+        st.metric("Total Team Members", counts["players"])
     with col2:
-        st.metric("Total Companies", len(companies_df))
+        st.metric("Total Companies", counts["companies"])
     with col3:
-        partners_count = len(players_df[players_df["designation"] == "Partner"])
+        partners_count = int(summaries["designation"].get("Partner", 0))
         st.metric("Partners", partners_count)
     with col4:
-        portfolio_count = len(portfolios_df)
+        portfolio_count = counts["portfolios"]
         st.metric("Portfolio Entries", portfolio_count)
 
     st.markdown("---")
@@ -178,21 +810,11 @@ with tabs[0]:
 
         with col_a:
             st.markdown("**By Designation**")
-            designation_counts = players_df["designation"].value_counts()
-            st.dataframe(
-                designation_counts.reset_index().rename(columns={"index": "Designation", "designation": "Count"}),
-                use_container_width=True,
-                hide_index=True
-            )
+            render_counts(summaries["designation"], "Designation")
 
         with col_b:
             st.markdown("**By Team**")
-            team_counts = players_df["team"].value_counts()
-            st.dataframe(
-                team_counts.reset_index().rename(columns={"index": "Team", "team": "Count"}),
-                use_container_width=True,
-                hide_index=True
-            )
+            render_counts(summaries["team"], "Team")
 
     st.markdown("---")
 
@@ -203,21 +825,11 @@ with tabs[0]:
 
         with col_c:
             st.markdown("**By Pipeline Stage**")
-            stage_counts = companies_df["pipeline_stage"].value_counts()
-            st.dataframe(
-                stage_counts.reset_index().rename(columns={"index": "Stage", "pipeline_stage": "Count"}),
-                use_container_width=True,
-                hide_index=True
-            )
+            render_counts(summaries["pipeline_stage"], "Stage")
 
         with col_d:
             st.markdown("**By Sector**")
-            sector_counts = companies_df["sector"].value_counts()
-            st.dataframe(
-                sector_counts.reset_index().rename(columns={"index": "Sector", "sector": "Count"}),
-                use_container_width=True,
-                hide_index=True
-            )
+            render_counts(summaries["sector"], "Sector")
 
 
 # ---------- Team Members Tab ----------
@@ -225,35 +837,15 @@ with tabs[1]:
     st.header("Team Members")
 
     if len(players_df):
-        # Filters
-        col1, col2 = st.columns(2)
-        with col1:
-            designation_filter = st.selectbox(
-                "Filter by Designation",
-                options=["All"] + DESIGNATIONS
-            )
-        with col2:
-            team_filter = st.selectbox(
-                "Filter by Team",
-                options=["All"] + TEAMS
-            )
-
-        filtered_players = players_df.copy()
-        if designation_filter != "All":
-            filtered_players = filtered_players[filtered_players["designation"] == designation_filter]
-        if team_filter != "All":
-            filtered_players = filtered_players[filtered_players["team"] == team_filter]
-
-        st.dataframe(
-            filtered_players,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "player_id": st.column_config.NumberColumn("ID", width="small"),
-                "player_name": st.column_config.TextColumn("Name", width="medium"),
-                "designation": st.column_config.TextColumn("Designation", width="medium"),
-                "team": st.column_config.TextColumn("Team", width="large"),
-            }
+        render_filtered_table(
+            "players",
+            players_df,
+            [
+                ("designation", "Filter by Designation", ALL_DESIGNATIONS),
+                ("team", "Filter by Team", ALL_TEAMS),
+            ],
+            PLAYERS_COLUMN_CONFIG,
+            (file_stamp(PLAYERS_CSV),)
         )
     else:
         st.info("No team members yet. Add them from the **Admin** tab.")
@@ -264,48 +856,16 @@ with tabs[2]:
     st.header("Companies")
 
     if len(companies_df):
-        # Filters
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            pipeline_filter = st.selectbox(
-                "Filter by Pipeline Stage",
-                options=["All"] + PIPELINE_STAGES
-            )
-        with col2:
-            sector_filter = st.selectbox(
-                "Filter by Sector",
-                options=["All"] + SECTORS
-            )
-        with col3:
-            stage_filter = st.selectbox(
-                "Filter by Company Stage",
-                options=["All"] + COMPANY_STAGES
-            )
-
-        filtered_companies = companies_df.copy()
-        if pipeline_filter != "All":
-            filtered_companies = filtered_companies[filtered_companies["pipeline_stage"] == pipeline_filter]
-        if sector_filter != "All":
-            filtered_companies = filtered_companies[filtered_companies["sector"] == sector_filter]
-        if stage_filter != "All":
-            filtered_companies = filtered_companies[filtered_companies["company_stage"] == stage_filter]
-
-        st.dataframe(
-            filtered_companies,
-            use_container_width=True,
-            hide_index=True,
-            column_config={
-                "company_id": st.column_config.NumberColumn("ID", width="small"),
-                "company_name": st.column_config.TextColumn("Company Name", width="medium"),
-                "pipeline_stage": st.column_config.TextColumn("Pipeline Stage", width="small"),
-                "founder_archetype": st.column_config.TextColumn("Founder Type", width="small"),
-                "sector": st.column_config.TextColumn("Sector", width="small"),
-                "company_stage": st.column_config.TextColumn("Stage", width="small"),
-                "cheque": st.column_config.TextColumn("Cheque", width="small"),
-                "lead": st.column_config.TextColumn("Lead", width="medium"),
-                "co_lead": st.column_config.TextColumn("Co-Lead", width="medium"),
-                "deal_team": st.column_config.TextColumn("Deal Team", width="large"),
-            }
+        render_filtered_table(
+            "companies",
+            companies_df,
+            [
+                ("pipeline_stage", "Filter by Pipeline Stage", ALL_PIPELINE_STAGES),
+                ("sector", "Filter by Sector", ALL_SECTORS),
+                ("company_stage", "Filter by Company Stage", ALL_COMPANY_STAGES),
+            ],
+            COMPANIES_COLUMN_CONFIG,
+            (file_stamp(COMPANIES_CSV),)
         )
     else:
         st.info("No companies yet. Add them from the **Admin** tab.")
@@ -315,32 +875,15 @@ with tabs[2]:
 with tabs[3]:
     st.header("Model Portfolios")
 
-    if len(portfolios_df):
-        # Filter by designation
-        designation_filter = st.selectbox(
-            "Filter by Designation",
-            options=["All"] + DESIGNATIONS,
-            key="portfolio_designation_filter"
+    if len(portfolio_view):
+        render_filtered_table(
+            "portfolios",
+            portfolio_view,
+            [("designation", "Filter by Designation", ALL_DESIGNATIONS)],
+            PORTFOLIOS_COLUMN_CONFIG,
+            (file_stamp(PORTFOLIOS_CSV), file_stamp(PLAYERS_CSV)),
+            empty_message="No portfolio entries for {}."
         )
-
-        filtered_portfolios = portfolios_df.copy()
-        if designation_filter != "All":
-            filtered_portfolios = filtered_portfolios[filtered_portfolios["designation"] == designation_filter]
-
-        if len(filtered_portfolios):
-            st.dataframe(
-                filtered_portfolios,
-                use_container_width=True,
-                hide_index=True,
-                column_config={
-                    "player_id": st.column_config.NumberColumn("ID", width="small"),
-                    "player_name": st.column_config.TextColumn("Name", width="medium"),
-                    "designation": st.column_config.TextColumn("Designation", width="medium"),
-                    "companies": st.column_config.TextColumn("Companies", width="large"),
-                }
-            )
-        else:
-            st.info(f"No portfolio entries for {designation_filter}.")
     else:
         st.info("No model portfolio entries yet. Use **Admin → Manage Model Portfolios**.")
 
@@ -350,59 +893,28 @@ with tabs[4]:
     st.header("💡 Deal Fantasy League Insights")
 
     # Prepare vote data from portfolios
-    if len(portfolios_df) == 0 or len(companies_df) == 0:
+    if len(portfolio_view) == 0 or len(companies_df) == 0:
         st.info("📊 Add companies and model portfolios to see insights.")
-    else:
-        # Create vote matrix: which players voted for which companies
-        vote_data = []
-        for _, portfolio in portfolios_df.iterrows():
-            player_id = portfolio['player_id']
-            player_name = portfolio['player_name']
-            designation = portfolio['designation']
-            companies_str = portfolio['companies']
-
-            if pd.notna(companies_str) and companies_str:
-                voted_companies = [c.strip() for c in companies_str.split(',')]
-                for company in voted_companies:
-                    vote_data.append({
-                        'player_id': player_id,
-                        'player_name': player_name,
-                        'designation': designation,
-                        'company_name': company
-                    })
-
-        votes_df = pd.DataFrame(vote_data)
-
-        # Merge with company data to get pipeline stages, leads, etc.
-        if len(votes_df) > 0:
-            votes_df = votes_df.merge(
-                companies_df[['company_name', 'pipeline_stage', 'sector', 'cheque', 'lead', 'co_lead']],
-                on='company_name',
-                how='left'
-            )
-
-        # Merge players with designation/team info
-        if len(votes_df) > 0:
-            votes_df = votes_df.merge(
-                players_df[['player_name', 'team']],
-                on='player_name',
-                how='left'
-            )
+    elif tabs[4].open:
+        version = data_version()
+        insights = compute_insights(version, players_df, companies_df, portfolio_view)
+        votes_df = insights['votes_df']
+        n_votes = len(votes_df)
 
         # ====================
         # SECTION 1: Overview Metrics
         # ====================
         st.subheader("📊 Overview Metrics")
 
-        total_votes = len(votes_df) if len(votes_df) > 0 else 0
-        total_companies = len(companies_df)
-        total_players = len(players_df)
+        total_votes = n_votes
+        total_companies = counts["companies"]
+        total_players = counts["players"]
 
         # Calculate companies with votes
-        if len(votes_df) > 0:
+        if n_votes:
             companies_with_votes = votes_df['company_name'].nunique()
             companies_with_zero_votes = total_companies - companies_with_votes
-            avg_votes_per_company = votes_df.groupby('company_name').size().mean() if len(votes_df) > 0 else 0
+            avg_votes_per_company = insights['avg_votes_per_company']
         else:
             companies_with_votes = 0
             companies_with_zero_votes = total_companies
@@ -417,7 +929,7 @@ with tabs[4]:
 
         st.markdown("---")
 
-        if len(votes_df) == 0:
+        if not n_votes:
             st.info("No votes cast yet. Assign companies to team members in Model Portfolios to see insights.")
         else:
             # ====================
@@ -426,15 +938,7 @@ with tabs[4]:
             st.subheader("📈 Vote Distribution Analysis")
             st.caption("Understanding which companies are getting the most attention from the team")
 
-            # Calculate votes per company
-            company_votes = votes_df.groupby('company_name').size().reset_index(name='votes')
-            company_votes = company_votes.sort_values('votes', ascending=False)
-
-            # Add companies with zero votes
-            all_companies = companies_df[['company_name']].copy()
-            all_companies = all_companies.merge(company_votes, on='company_name', how='left')
-            all_companies['votes'] = all_companies['votes'].fillna(0).astype(int)
-            all_companies = all_companies.sort_values('votes', ascending=False)
+            all_companies = insights['all_companies']
 
             col_a, col_b = st.columns(2)
 
@@ -453,7 +957,7 @@ with tabs[4]:
                     showlegend=False,
                     height=400
                 )
-                st.plotly_chart(fig_donut, use_container_width=True)
+                st.plotly_chart(fig_donut, use_container_width=True, config=PLOTLY_CFG)
 
             with col_b:
                 # Horizontal bar chart
@@ -468,7 +972,7 @@ with tabs[4]:
                     labels={'votes': 'Number of Votes', 'company_name': 'Company'}
                 )
                 fig_bar.update_layout(height=400, showlegend=False)
-                st.plotly_chart(fig_bar, use_container_width=True)
+                st.plotly_chart(fig_bar, use_container_width=True, config=PLOTLY_CFG)
 
             st.markdown("---")
 
@@ -478,22 +982,14 @@ with tabs[4]:
             st.subheader("🎯 Pipeline Stage Analysis")
             st.caption("How votes are distributed across different pipeline stages")
 
-            # Merge companies with votes
-            stage_analysis = companies_df.merge(
-                all_companies[['company_name', 'votes']],
-                on='company_name',
-                how='left'
-            )
-            stage_analysis['votes'] = stage_analysis['votes'].fillna(0)
+            stage_analysis = insights['stage_analysis']
 
             col_c, col_d = st.columns(2)
 
             with col_c:
                 # Count companies per stage
-                stage_counts = stage_analysis.groupby('pipeline_stage').size().reset_index(name='count')
-                stage_order = ['Showcase', 'IC', 'Wired']
-                stage_counts['pipeline_stage'] = pd.Categorical(stage_counts['pipeline_stage'], categories=stage_order, ordered=True)
-                stage_counts = stage_counts.sort_values('pipeline_stage')
+                # (pipeline_stage is an ordered categorical, so results come out Showcase -> IC -> Wired)
+                stage_counts = count_by(stage_analysis['pipeline_stage'], 'count')
 
                 fig_stage_count = px.area(
                     stage_counts,
@@ -505,13 +1001,11 @@ with tabs[4]:
                     color_discrete_sequence=['#1f77b4']
                 )
                 fig_stage_count.update_layout(height=350)
-                st.plotly_chart(fig_stage_count, use_container_width=True)
+                st.plotly_chart(fig_stage_count, use_container_width=True, config=PLOTLY_CFG)
 
             with col_d:
                 # Average votes by stage
-                stage_votes_avg = stage_analysis.groupby('pipeline_stage')['votes'].mean().reset_index()
-                stage_votes_avg['pipeline_stage'] = pd.Categorical(stage_votes_avg['pipeline_stage'], categories=stage_order, ordered=True)
-                stage_votes_avg = stage_votes_avg.sort_values('pipeline_stage')
+                stage_votes_avg = stage_analysis.groupby('pipeline_stage', observed=True)['votes'].mean().reset_index()
 
                 fig_stage_votes = px.bar(
                     stage_votes_avg,
@@ -523,7 +1017,7 @@ with tabs[4]:
                     color_continuous_scale='Blues'
                 )
                 fig_stage_votes.update_layout(height=350, showlegend=False)
-                st.plotly_chart(fig_stage_votes, use_container_width=True)
+                st.plotly_chart(fig_stage_votes, use_container_width=True, config=PLOTLY_CFG)
 
             # Box plot for vote distribution by stage
             fig_box = px.box(
@@ -536,7 +1030,7 @@ with tabs[4]:
                 color_discrete_sequence=px.colors.qualitative.Set2
             )
             fig_box.update_layout(height=350, showlegend=False)
-            st.plotly_chart(fig_box, use_container_width=True)
+            st.plotly_chart(fig_box, use_container_width=True, config=PLOTLY_CFG)
 
             st.markdown("---")
 
@@ -546,29 +1040,16 @@ with tabs[4]:
             st.subheader("👔 Lead & Co-Lead Performance")
             st.caption("How deals led by different partners are performing in votes")
 
-            # Parse leads and co-leads (they're comma-separated)
-            lead_votes = []
-            for _, row in stage_analysis.iterrows():
-                if pd.notna(row['lead']) and row['lead']:
-                    leads = [l.strip() for l in row['lead'].split(',')]
-                    for lead in leads:
-                        lead_votes.append({
-                            'lead': lead,
-                            'pipeline_stage': row['pipeline_stage'],
-                            'votes': row['votes'],
-                            'company': row['company_name']
-                        })
+            lead_votes_df = insights['lead_votes_df']
 
-            if lead_votes:
-                lead_votes_df = pd.DataFrame(lead_votes)
+            if len(lead_votes_df):
+                # Stagewise and overall averages share one groupby
+                lead_stage_votes, lead_overall = average_votes_by(lead_votes_df, 'lead')
 
                 col_e, col_f = st.columns(2)
 
                 with col_e:
                     # Stagewise vote distribution for leads
-                    lead_stage_votes = lead_votes_df.groupby(['lead', 'pipeline_stage'])['votes'].mean().reset_index()
-                    lead_stage_votes['pipeline_stage'] = pd.Categorical(lead_stage_votes['pipeline_stage'], categories=stage_order, ordered=True)
-
                     fig_lead_stage = px.bar(
                         lead_stage_votes,
                         x='votes',
@@ -581,11 +1062,10 @@ with tabs[4]:
                         barmode='group'
                     )
                     fig_lead_stage.update_layout(height=400)
-                    st.plotly_chart(fig_lead_stage, use_container_width=True)
+                    st.plotly_chart(fig_lead_stage, use_container_width=True, config=PLOTLY_CFG)
 
                 with col_f:
                     # Overall average votes by lead
-                    lead_overall = lead_votes_df.groupby('lead')['votes'].mean().reset_index()
                     lead_overall = lead_overall.sort_values('votes', ascending=True)
 
                     fig_lead_overall = px.bar(
@@ -599,31 +1079,19 @@ with tabs[4]:
                         color_continuous_scale='Blues'
                     )
                     fig_lead_overall.update_layout(height=400, showlegend=False)
-                    st.plotly_chart(fig_lead_overall, use_container_width=True)
+                    st.plotly_chart(fig_lead_overall, use_container_width=True, config=PLOTLY_CFG)
 
             # Co-Lead analysis
-            co_lead_votes = []
-            for _, row in stage_analysis.iterrows():
-                if pd.notna(row['co_lead']) and row['co_lead']:
-                    co_leads = [c.strip() for c in row['co_lead'].split(',')]
-                    for co_lead in co_leads:
-                        co_lead_votes.append({
-                            'co_lead': co_lead,
-                            'pipeline_stage': row['pipeline_stage'],
-                            'votes': row['votes'],
-                            'company': row['company_name']
-                        })
+            co_lead_votes_df = insights['co_lead_votes_df']
 
-            if co_lead_votes:
-                co_lead_votes_df = pd.DataFrame(co_lead_votes)
+            if len(co_lead_votes_df):
+                # Stagewise and overall averages share one groupby
+                co_lead_stage_votes, co_lead_overall = average_votes_by(co_lead_votes_df, 'co_lead')
 
                 col_g, col_h = st.columns(2)
 
                 with col_g:
                     # Stagewise vote distribution for co-leads
-                    co_lead_stage_votes = co_lead_votes_df.groupby(['co_lead', 'pipeline_stage'])['votes'].mean().reset_index()
-                    co_lead_stage_votes['pipeline_stage'] = pd.Categorical(co_lead_stage_votes['pipeline_stage'], categories=stage_order, ordered=True)
-
                     fig_co_lead_stage = px.bar(
                         co_lead_stage_votes,
                         x='votes',
@@ -636,11 +1104,10 @@ with tabs[4]:
                         barmode='group'
                     )
                     fig_co_lead_stage.update_layout(height=400)
-                    st.plotly_chart(fig_co_lead_stage, use_container_width=True)
+                    st.plotly_chart(fig_co_lead_stage, use_container_width=True, config=PLOTLY_CFG)
 
                 with col_h:
                     # Overall average votes by co-lead
-                    co_lead_overall = co_lead_votes_df.groupby('co_lead')['votes'].mean().reset_index()
                     co_lead_overall = co_lead_overall.sort_values('votes', ascending=True)
 
                     fig_co_lead_overall = px.bar(
@@ -654,7 +1121,7 @@ with tabs[4]:
                         color_continuous_scale='Teal'
                     )
                     fig_co_lead_overall.update_layout(height=400, showlegend=False)
-                    st.plotly_chart(fig_co_lead_overall, use_container_width=True)
+                    st.plotly_chart(fig_co_lead_overall, use_container_width=True, config=PLOTLY_CFG)
 
             st.markdown("---")
 
@@ -664,13 +1131,7 @@ with tabs[4]:
             st.subheader("🎮 Player Analytics")
             st.caption("Understanding voting patterns and engagement across team members")
 
-            # Create voting matrix for heatmap
-            vote_matrix = votes_df.pivot_table(
-                index='player_name',
-                columns='company_name',
-                aggfunc='size',
-                fill_value=0
-            )
+            vote_matrix = insights['vote_matrix']
 
             # Heatmap
             fig_heatmap = px.imshow(
@@ -681,14 +1142,15 @@ with tabs[4]:
                 aspect='auto'
             )
             fig_heatmap.update_layout(height=max(400, len(vote_matrix) * 30))
-            st.plotly_chart(fig_heatmap, use_container_width=True)
+            st.plotly_chart(fig_heatmap, use_container_width=True, config=PLOTLY_CFG)
 
             col_i, col_j = st.columns(2)
 
             with col_i:
                 # Player activity by designation
-                player_activity = votes_df.groupby(['player_name', 'designation']).size().reset_index(name='votes')
-                player_activity = player_activity.sort_values('votes', ascending=True)
+                player_activity = votes_df.groupby(['player_name', 'designation'], observed=True).size().reset_index(name='votes')
+                player_activity = player_activity.sort_values('votes', ascending=True, kind='stable')
+                player_activity['votes'] = smallest_int(player_activity['votes'])
 
                 fig_player_activity = px.bar(
                     player_activity,
@@ -701,11 +1163,11 @@ with tabs[4]:
                     color_discrete_sequence=px.colors.qualitative.Set3
                 )
                 fig_player_activity.update_layout(height=max(400, len(player_activity) * 25))
-                st.plotly_chart(fig_player_activity, use_container_width=True)
+                st.plotly_chart(fig_player_activity, use_container_width=True, config=PLOTLY_CFG)
 
             with col_j:
                 # Designation-wise participation
-                designation_votes = votes_df.groupby('designation').size().reset_index(name='votes')
+                designation_votes = count_by(votes_df['designation'], 'votes')
 
                 fig_designation = go.Figure(data=[go.Pie(
                     labels=designation_votes['designation'],
@@ -718,12 +1180,13 @@ with tabs[4]:
                     title='Vote Distribution by Designation',
                     height=400
                 )
-                st.plotly_chart(fig_designation, use_container_width=True)
+                st.plotly_chart(fig_designation, use_container_width=True, config=PLOTLY_CFG)
 
             # Team/Pod analysis
             if 'team' in votes_df.columns:
-                team_votes = votes_df.groupby('team').size().reset_index(name='votes')
-                team_votes = team_votes.sort_values('votes', ascending=False)
+                team_votes = count_by(votes_df['team'], 'votes')
+                team_votes = team_votes.sort_values('votes', ascending=False, kind='stable')
+                team_votes['votes'] = smallest_int(team_votes['votes'])
 
                 fig_team = px.bar(
                     team_votes,
@@ -736,7 +1199,7 @@ with tabs[4]:
                 )
                 fig_team.update_layout(height=350, showlegend=False)
                 fig_team.update_xaxes(tickangle=-45)
-                st.plotly_chart(fig_team, use_container_width=True)
+                st.plotly_chart(fig_team, use_container_width=True, config=PLOTLY_CFG)
 
             st.markdown("---")
 
@@ -747,13 +1210,17 @@ with tabs[4]:
             st.caption("Deep dive into consensus, alignment, and cheque type analysis")
 
             # Consensus score
-            total_players_count = len(players_df)
-            company_vote_percentage = all_companies.copy()
-            company_vote_percentage['vote_percentage'] = (company_vote_percentage['votes'] / total_players_count * 100).round(1)
-            company_vote_percentage = company_vote_percentage.sort_values('vote_percentage', ascending=False)
+            total_players_count = counts["players"]
+            # all_companies is already ranked by votes, and the percentage follows votes
+            company_vote_percentage = all_companies.assign(
+                vote_percentage=(all_companies['votes'] / total_players_count * 100).round(1)
+            )
 
-            high_consensus = company_vote_percentage[company_vote_percentage['vote_percentage'] >= 50]
-            low_consensus = company_vote_percentage[company_vote_percentage['vote_percentage'] < 20]
+            # Ranked descending, so both panels are slices found by binary search
+            negated_pct = -company_vote_percentage['vote_percentage'].to_numpy()
+            high_end, low_start = np.searchsorted(negated_pct, [-50, -20], side='right')
+            high_consensus = company_vote_percentage.iloc[:high_end]
+            low_consensus = company_vote_percentage.iloc[low_start:]
 
             col_k, col_l = st.columns(2)
 
@@ -761,8 +1228,7 @@ with tabs[4]:
                 if len(high_consensus) > 0:
                     st.success(f"💡 **High Consensus Deals ({len(high_consensus)} companies)**")
                     st.caption("More than 50% of the team voted for these companies")
-                    for _, row in high_consensus.iterrows():
-                        st.write(f"• **{row['company_name']}** - {row['vote_percentage']}% ({int(row['votes'])} votes)")
+                    st.markdown(consensus_lines(high_consensus))
                 else:
                     st.info("No high consensus deals yet (>50% team voting)")
 
@@ -770,82 +1236,55 @@ with tabs[4]:
                 if len(low_consensus) > 0:
                     st.warning(f"⚠️ **Underrated Companies ({len(low_consensus)} companies)**")
                     st.caption("Less than 20% of the team voted for these companies")
-                    for _, row in low_consensus.head(5).iterrows():
-                        st.write(f"• **{row['company_name']}** - {row['vote_percentage']}% ({int(row['votes'])} votes)")
+                    st.markdown(consensus_lines(low_consensus.head(5)))
                 else:
                     st.success("All companies have reasonable attention (>20% voting)")
 
             # Cheque type analysis
             if 'cheque' in companies_df.columns:
-                cheque_analysis = stage_analysis.groupby('cheque')['votes'].agg(['sum', 'mean', 'count']).reset_index()
-                cheque_analysis.columns = ['Cheque Type', 'Total Votes', 'Avg Votes', 'Count']
+                fig_cheque_total, fig_cheque_avg = cheque_figures(version, stage_analysis)
 
                 col_m, col_n = st.columns(2)
 
                 with col_m:
-                    fig_cheque_total = px.bar(
-                        cheque_analysis,
-                        x='Cheque Type',
-                        y='Total Votes',
-                        title='Total Votes by Cheque Type',
-                        color='Total Votes',
-                        color_continuous_scale='Blues'
-                    )
-                    fig_cheque_total.update_layout(height=350, showlegend=False)
-                    st.plotly_chart(fig_cheque_total, use_container_width=True)
+                    st.plotly_chart(fig_cheque_total, use_container_width=True, config=PLOTLY_CFG)
 
                 with col_n:
-                    fig_cheque_avg = px.bar(
-                        cheque_analysis,
-                        x='Cheque Type',
-                        y='Avg Votes',
-                        title='Average Votes by Cheque Type',
-                        color='Avg Votes',
-                        color_continuous_scale='Teal'
-                    )
-                    fig_cheque_avg.update_layout(height=350, showlegend=False)
-                    st.plotly_chart(fig_cheque_avg, use_container_width=True)
+                    st.plotly_chart(fig_cheque_avg, use_container_width=True, config=PLOTLY_CFG)
 
             # Lead-Player Alignment (same pod voting)
-            if 'team' in votes_df.columns and lead_votes and 'lead' in votes_df.columns:
+            if 'team' in votes_df.columns and len(lead_votes_df) and 'lead' in votes_df.columns:
                 # Check if we have lead data in votes_df
-                votes_with_lead_data = votes_df[votes_df['lead'].notna()].copy()
+                votes_with_lead_data = votes_df[votes_df['lead'].notna()]
 
                 if len(votes_with_lead_data) > 0:
                     st.markdown("#### Lead-Player Alignment Analysis")
                     st.caption("Do players vote more for deals led by partners from their own pod?")
 
-                    # Check if same pod
-                    alignment_data = []
-                    for _, vote in votes_with_lead_data.iterrows():
-                        if vote['lead']:
-                            leads = [l.strip() for l in str(vote['lead']).split(',')]
-                            for lead in leads:
-                                lead_team_data = players_df[players_df['player_name'] == lead]
-                                if len(lead_team_data) > 0:
-                                    lead_team = lead_team_data.iloc[0]['team']
-                                    voter_team = vote['team']
-                                    same_pod = (lead_team == voter_team)
-                                    alignment_data.append({
-                                        'same_pod': 'Same Pod' if same_pod else 'Cross-Pod',
-                                        'count': 1
-                                    })
-
-                    if alignment_data:
-                        alignment_df = pd.DataFrame(alignment_data)
-                        alignment_summary = alignment_df.groupby('same_pod').size().reset_index(name='votes')
-
-                        fig_alignment = px.pie(
-                            alignment_summary,
-                            names='same_pod',
-                            values='votes',
-                            title='Same-Pod vs Cross-Pod Voting',
-                            color_discrete_sequence=px.colors.qualitative.Set2
+                    # Check if same pod: one row per (vote, known lead), comparing the
+                    # lead's team with the voter's as whole columns
+                    team_by_player = name_index(file_stamp(PLAYERS_CSV), players_df, 'player_name', 'team')
+                    vote_leads = explode_list(votes_with_lead_data, 'lead', 'lead')
+                    vote_leads = vote_leads[vote_leads['lead'].isin(list(team_by_player))]
+
+                    if len(vote_leads):
+                        same_pod = (
+                            vote_leads['lead'].map(team_by_player).to_numpy(dtype=object)
+                            == vote_leads['team'].to_numpy(dtype=object)
                         )
-                        fig_alignment.update_layout(height=350)
-                        st.plotly_chart(fig_alignment, use_container_width=True)
+                        # Cross-pod and same-pod counts in one pass over the mask
+                        cross_pod_votes, same_pod_votes = np.bincount(same_pod.astype(np.int8), minlength=2)
+                        # Two-row summary straight from the counts, leaving out an empty side
+                        alignment_summary = pd.DataFrame({
+                            'same_pod': ['Cross-Pod', 'Same Pod'],
+                            'votes': [cross_pod_votes, same_pod_votes],
+                        })
+                        alignment_summary = alignment_summary[alignment_summary['votes'] > 0]
 
-                        same_pod_pct = alignment_summary[alignment_summary['same_pod'] == 'Same Pod']['votes'].sum() / alignment_summary['votes'].sum() * 100
+                        fig_alignment = alignment_figure(version, alignment_summary)
+                        st.plotly_chart(fig_alignment, use_container_width=True, config=PLOTLY_CFG)
+
+                        same_pod_pct = same_pod_votes / len(same_pod) * 100
                         if same_pod_pct > 60:
                             st.info(f"💡 **Insight:** {same_pod_pct:.1f}% of votes are for deals led by partners from the same pod, showing strong team alignment.")
                         elif same_pod_pct < 40:
@@ -882,186 +1321,95 @@ with tabs[5]:
         st.subheader("Add Team Member")
 
         with st.form("add_player_form", clear_on_submit=True):
-            player_name = st.text_input("Name *", placeholder="Enter full name")
+            st.text_input("Name *", placeholder="Enter full name", key="new_player_name")
 
             col1, col2 = st.columns(2)
             with col1:
-                designation = st.selectbox("Designation *", options=DESIGNATIONS)
+                st.selectbox("Designation *", options=DESIGNATIONS, key="new_player_designation")
             with col2:
-                team = st.selectbox("Team *", options=TEAMS)
-
-            submitted = st.form_submit_button("➕ Add Team Member", use_container_width=True)
-
-            if submitted:
-                if not player_name.strip():
-                    st.error("❌ Name is required.")
-                else:
-                    players_df = load_csv(PLAYERS_CSV, PLAYER_COLUMNS)
-                    new_id = int(players_df["player_id"].max() + 1) if len(players_df) else 1
-
-                    new_row = {
-                        "player_id": new_id,
-                        "player_name": player_name.strip(),
-                        "designation": designation,
-                        "team": team,
-                    }
+                st.selectbox("Team *", options=TEAMS, key="new_player_team")
 
-                    players_df = pd.concat([players_df, pd.DataFrame([new_row])], ignore_index=True)
-                    save_csv(players_df, PLAYERS_CSV)
-                    st.success(f"✅ Team member '{player_name}' added successfully!")
-                    st.rerun()
+            st.form_submit_button("➕ Add Team Member", use_container_width=True, on_click=add_team_member)
+            show_flash("add_player")
 
     # --- Add Company ---
     with admin_subtabs[1]:
         st.subheader("Add Company")
 
-        # Reload to get latest partners list
-        current_players_df = load_csv(PLAYERS_CSV, PLAYER_COLUMNS)
-        partners = get_partners(current_players_df)
-        all_players = get_all_players_names(current_players_df)
+        players_stamp = file_stamp(PLAYERS_CSV)
+        partners = get_partners(players_stamp, players_df)
+        all_players = get_all_players_names(players_stamp, players_df)
 
         if not partners:
             st.warning("⚠️ No partners found. Please add at least one team member with 'Partner' designation first.")
 
         with st.form("add_company_form", clear_on_submit=True):
-            company_name = st.text_input("Company Name *", placeholder="Enter company name")
+            st.text_input("Company Name *", placeholder="Enter company name", key="new_company_name")
 
             col1, col2, col3 = st.columns(3)
             with col1:
-                pipeline_stage = st.selectbox("Pipeline Stage *", options=PIPELINE_STAGES)
+                st.selectbox("Pipeline Stage *", options=PIPELINE_STAGES, key="new_company_pipeline_stage")
             with col2:
-                founder_archetype = st.selectbox("Founder Archetype *", options=FOUNDER_ARCHETYPES)
+                st.selectbox("Founder Archetype *", options=FOUNDER_ARCHETYPES, key="new_company_founder_archetype")
             with col3:
-                company_stage = st.selectbox("Company Stage *", options=COMPANY_STAGES)
+                st.selectbox("Company Stage *", options=COMPANY_STAGES, key="new_company_stage")
 
             col4, col5 = st.columns(2)
             with col4:
-                sector = st.selectbox("Sector *", options=SECTORS)
+                st.selectbox("Sector *", options=SECTORS, key="new_company_sector")
             with col5:
-                cheque = st.selectbox("Cheque *", options=CHEQUE_OPTIONS)
+                st.selectbox("Cheque *", options=CHEQUE_OPTIONS, key="new_company_cheque")
 
             st.markdown("**Deal Team Configuration**")
             col_a, col_b, col_c = st.columns(3)
             with col_a:
-                lead = st.multiselect("Lead *", options=partners, help="Select partner(s) leading this deal")
+                st.multiselect(
+                    "Lead *", options=partners, help="Select partner(s) leading this deal", key="new_company_lead"
+                )
             with col_b:
-                co_lead = st.multiselect("Co-Lead", options=all_players, help="Select co-lead(s)")
+                st.multiselect("Co-Lead", options=all_players, help="Select co-lead(s)", key="new_company_co_lead")
             with col_c:
-                deal_team = st.multiselect("Deal Team", options=all_players, help="Select deal team members")
-
-            submitted = st.form_submit_button("➕ Add Company", use_container_width=True)
+                st.multiselect(
+                    "Deal Team", options=all_players, help="Select deal team members", key="new_company_deal_team"
+                )
 
-            if submitted:
-                if not company_name.strip():
-                    st.error("❌ Company name is required.")
-                elif not lead:
-                    st.error("❌ At least one lead is required.")
-                else:
-                    companies_df = load_csv(COMPANIES_CSV, COMPANY_COLUMNS)
-                    new_id = int(companies_df["company_id"].max() + 1) if len(companies_df) else 1
-
-                    new_row = {
-                        "company_id": new_id,
-                        "company_name": company_name.strip(),
-                        "pipeline_stage": pipeline_stage,
-                        "founder_archetype": founder_archetype,
-                        "sector": sector,
-                        "company_stage": company_stage,
-                        "cheque": cheque,
-                        "lead": ", ".join(lead),
-                        "co_lead": ", ".join(co_lead) if co_lead else "",
-                        "deal_team": ", ".join(deal_team) if deal_team else "",
-                    }
-
-                    companies_df = pd.concat([companies_df, pd.DataFrame([new_row])], ignore_index=True)
-                    save_csv(companies_df, COMPANIES_CSV)
-                    st.success(f"✅ Company '{company_name}' added successfully!")
-                    st.rerun()
+            st.form_submit_button("➕ Add Company", use_container_width=True, on_click=add_company)
+            show_flash("add_company")
 
     # --- Manage Model Portfolios ---
     with admin_subtabs[2]:
         st.subheader("Manage Model Portfolios")
 
-        current_players_df = load_csv(PLAYERS_CSV, PLAYER_COLUMNS)
-        current_companies_df = load_csv(COMPANIES_CSV, COMPANY_COLUMNS)
-
-        if not len(current_players_df) or not len(current_companies_df):
+        if not len(players_df) or not len(companies_df):
             st.warning("⚠️ You need at least one team member and one company to manage portfolios.")
         else:
             # Group players by designation for clean display
             st.markdown("**Assign companies to team members**")
 
+            # Same options and lookups for every player's form - compute them once
+            company_options = unique_sorted(tuple(companies_df["company_name"]))
+            company_option_set = set(company_options)
+            # Each player's saved companies, split in one pass over the column
+            portfolio_by_pid = (
+                explode_list(portfolios_df.drop_duplicates("player_id"), "companies", "company")
+                .groupby("player_id", sort=False)["company"].agg(list).to_dict()
+            )
+            players_by_designation = dict(list(players_df.groupby("designation", sort=False, observed=True)))
+
             for designation in DESIGNATIONS:
-                players_in_designation = current_players_df[
-                    current_players_df["designation"] == designation
-                ]
-
-                if len(players_in_designation):
-                    st.markdown(f"### {designation}")
-
-                    for _, player in players_in_designation.iterrows():
-                        with st.form(f"portfolio_form_{player['player_id']}", clear_on_submit=False):
-                            st.markdown(f"**{player['player_name']}** — _{player['team']}_")
-
-                            # Get current companies for this player
-                            current_portfolio = portfolios_df[
-                                portfolios_df["player_id"] == player["player_id"]
-                            ]
-
-                            current_companies_str = ""
-                            if len(current_portfolio):
-                                current_companies_str = current_portfolio.iloc[0]["companies"]
-
-                            current_companies_list = []
-                            if current_companies_str:
-                                current_companies_list = [c.strip() for c in current_companies_str.split(",")]
-
-                            # Multiselect for companies
-                            company_options = sorted(current_companies_df["company_name"].dropna().tolist())
-
-                            # Filter current companies to only include those that still exist
-                            valid_current_companies = [c for c in current_companies_list if c in company_options]
-
-                            selected_companies = st.multiselect(
-                                "Companies",
-                                options=company_options,
-                                default=valid_current_companies,
-                                key=f"companies_{player['player_id']}",
-                                label_visibility="collapsed"
-                            )
-
-                            col_save, col_clear = st.columns([1, 1])
-                            with col_save:
-                                save_btn = st.form_submit_button("💾 Save", use_container_width=True)
-                            with col_clear:
-                                clear_btn = st.form_submit_button("🗑️ Clear", use_container_width=True)
-
-                            if save_btn:
-                                # Reload latest data
-                                portfolios_df = load_csv(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS)
-
-                                # Remove existing entry for this player
-                                portfolios_df = portfolios_df[portfolios_df["player_id"] != player["player_id"]]
-
-                                # Add new entry if companies selected
-                                if selected_companies:
-                                    new_row = {
-                                        "player_id": player["player_id"],
-                                        "player_name": player["player_name"],
-                                        "designation": player["designation"],
-                                        "companies": ", ".join(selected_companies),
-                                    }
-                                    portfolios_df = pd.concat([portfolios_df, pd.DataFrame([new_row])], ignore_index=True)
-
-                                save_csv(portfolios_df, PORTFOLIOS_CSV)
-                                st.success(f"✅ Portfolio updated for {player['player_name']}")
-                                st.rerun()
-
-                            if clear_btn:
-                                portfolios_df = load_csv(PORTFOLIOS_CSV, PORTFOLIO_COLUMNS)
-                                portfolios_df = portfolios_df[portfolios_df["player_id"] != player["player_id"]]
-                                save_csv(portfolios_df, PORTFOLIOS_CSV)
-                                st.success(f"✅ Portfolio cleared for {player['player_name']}")
-                                st.rerun()
-
-                        st.markdown("---")
+                players_in_designation = players_by_designation.get(designation)
+
+                if players_in_designation is not None:
+                    with st.expander(f"{designation} ({len(players_in_designation)})"):
+                        for player_id, player_name, team in zip(
+                            players_in_designation["player_id"].to_numpy(),
+                            players_in_designation["player_name"].to_numpy(),
+                            players_in_designation["team"].to_numpy(),
+                        ):
+                            # Get current companies for this player, keeping only those that still exist
+                            current_companies_list = portfolio_by_pid.get(player_id, [])
+                            valid_current_companies = [c for c in current_companies_list if c in company_option_set]
+
+                            portfolio_form(player_id, player_name, team, company_options, valid_current_companies)
+
+                            st.markdown("---")